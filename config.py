@@ -9,6 +9,9 @@ LANGUAGE_CONFIGS = {
     "python": {
         "extensions": [".py", ".pyw"],
         "language_name": "python",
+        # NOTE: Optional. A file containing none of these byte strings cannot match
+        # either query, so tree-sitter parsing is skipped for it entirely.
+        "sentinels": (b"import", b"def", b"class"),
         "queries": {
             "imports": """
                 (import_statement (dotted_name) @import.name)
@@ -27,6 +30,8 @@ LANGUAGE_CONFIGS = {
     "javascript": {
         "extensions": [".js", ".jsx", ".mjs", ".cjs"],
         "language_name": "javascript",
+        # NOTE: No sentinels: object-literal shorthand methods ({ m() {} }) match the
+        # method_definition query without any distinguishing keyword.
         "queries": {
             "imports": """
                 (import_statement source: (string) @import.name)
@@ -48,6 +53,7 @@ LANGUAGE_CONFIGS = {
     "typescript": {
         "extensions": [".ts", ".tsx"],
         "language_name": "typescript",
+        # NOTE: No sentinels, for the same reason as javascript.
         "queries": {
             "imports": """
                 (import_statement source: (string) @import.name)
@@ -67,6 +73,8 @@ LANGUAGE_CONFIGS = {
     "java": {
         "extensions": [".java"],
         "language_name": "java",
+        # Methods can only be declared inside a class, interface, enum or record body.
+        "sentinels": (b"import", b"class", b"interface", b"enum", b"record"),
         "queries": {
             "imports": """
                 (import_declaration (scoped_identifier) @import.name)
@@ -83,6 +91,7 @@ LANGUAGE_CONFIGS = {
     "go": {
         "extensions": [".go"],
         "language_name": "go",
+        "sentinels": (b"import", b"func", b"type"),
         "queries": {
             "imports": """
                 (import_spec path: (interpreted_string_literal) @import.name)
@@ -96,3 +105,10 @@ LANGUAGE_CONFIGS = {
     },
     # Other languages can be added here...
 }
+
+# Extension -> language name lookup, derived once from LANGUAGE_CONFIGS at import time.
+EXTENSION_TO_LANG_NAME = {
+    ext: name
+    for name, config in LANGUAGE_CONFIGS.items()
+    for ext in config["extensions"]
+}
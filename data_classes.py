@@ -2,7 +2,7 @@ from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, asdict
 
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     file_path: str
     functions: List[str]
@@ -12,7 +12,7 @@ class FileAnalysis:
     processing_time: float
 
 
-@dataclass
+@dataclass(slots=True)
 class RepositoryAnalysis:
     total_files: int
     total_functions: int
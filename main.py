@@ -2,9 +2,22 @@ import logging
 import json
 import argparse
 from dataclasses import asdict
+from pathlib import Path
 from repo_parser import PerformantRepositoryParser
 from config import logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -22,6 +35,12 @@ def main():
         default=10 * 1024 * 1024,
         help="Maximum file size to process in bytes (default: 10MB)",
     )
+    parser.add_argument(
+        "--max-files",
+        type=_positive_int,
+        help="Stop discovering files once this many have been queued for analysis "
+        "(default: no limit)",
+    )
     parser.add_argument("--no-cache", action="store_true", help="Disable caching")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument(
@@ -38,6 +57,7 @@ def main():
         max_workers=args.max_workers,
         max_file_size=args.max_file_size,
         use_cache=not args.no_cache,
+        max_files=args.max_files,
     )
 
     try:
@@ -102,10 +122,17 @@ def main():
                     "languages_found": sorted(list(result.languages_found)),
                     "processing_time": result.processing_time,
                 },
-                "files": [asdict(f) for f in result.files],
             }
-            with open(args.output, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # orjson serializes the FileAnalysis dataclasses natively
+                output_data["files"] = result.files
+                Path(args.output).write_bytes(
+                    orjson.dumps(output_data, option=orjson.OPT_INDENT_2)
+                )
+            else:
+                output_data["files"] = [asdict(f) for f in result.files]
+                with open(args.output, "w", encoding="utf-8") as f:
+                    json.dump(output_data, f, indent=2, ensure_ascii=False)
             print(f"\nDetailed results saved to: {args.output}")
 
     except KeyboardInterrupt:
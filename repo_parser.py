@@ -1,13 +1,25 @@
-from dataclasses import asdict
 import os
-import json
+import contextlib
+import mmap
+import pickle
 import hashlib
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import traceback
+from collections import deque, namedtuple
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Iterator, List, Tuple, Optional, Set
 from data_classes import FileAnalysis, RepositoryAnalysis
-from config import LANGUAGE_CONFIGS, logger
+from config import EXTENSION_TO_LANG_NAME, LANGUAGE_CONFIGS, logger
 
 try:
     from tree_sitter import Parser
@@ -17,31 +29,270 @@ except ImportError:
     print("pip install tree-sitter tree-sitter-languages")
     exit(1)
 
-WORKER_LANGUAGES = {}
+try:
+    from xxhash import xxh3_64_hexdigest
+except ImportError:
+    # Cache keys are local and non-adversarial; any fast 64-bit hash will do
+    def xxh3_64_hexdigest(content: bytes) -> str:
+        return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+LanguageData = namedtuple(
+    "LanguageData", ["parser_lang", "q_imports", "q_functions", "sentinels"]
+)
+FileEntry = namedtuple("FileEntry", ["path", "size", "mtime", "lang_name"])
+
+# Cache entries are pickled FileAnalysis objects, so loads need no dict round-trip.
+CACHE_SUFFIX = ".pkl"
+CACHE_READ_WORKERS = 32
+# Upper bound on the number of files a single worker task handles
+PARSE_CHUNK_SIZE = 32
+PROGRESS_LOG_INTERVAL = 500
+# Fresh process pools started after worker crashes before giving up on the rest
+MAX_POOL_RESTARTS = 10
+# Files pulled from the directory walk before their cache lookup and dispatch
+DISCOVERY_BATCH_SIZE = 1024
+# Below this size a plain read() is cheaper than setting up a memory map
+MMAP_THRESHOLD = 256 * 1024
+
+_WORKER_PARSER: Optional[Parser] = None
+_WORKER_CTX: Optional[Tuple[str, bool]] = None
+_WORKER_PARSER_LANG = None
+
+
+@lru_cache(maxsize=None)
+def _load_language(lang_name: str):
+    """
+    Loads a tree-sitter language once per worker; each get_language() call is a fresh
+    library load, so the parser and the queries must share this one object.
+    """
+    return get_language(LANGUAGE_CONFIGS[lang_name]["language_name"])
+
+
+@lru_cache(maxsize=None)
+def _get_query(lang_name: str, query_name: str):
+    """
+    Compiles and memoizes a single tree-sitter query, keyed by (language, query name).
+    """
+    query_source = LANGUAGE_CONFIGS[lang_name]["queries"][query_name]
+    return _load_language(lang_name).query(query_source)
 
 
-def _get_language_for_worker(lang_name: str):
+@lru_cache(maxsize=None)
+def _get_language_for_worker(lang_name: str) -> Optional[LanguageData]:
     """
     Loads and caches a tree-sitter language and its queries within a worker process.
     This prevents re-loading from disk for every file.
     """
-    if lang_name not in WORKER_LANGUAGES:
-        try:
-            config = LANGUAGE_CONFIGS[lang_name]
-            language = get_language(config["language_name"])
-            WORKER_LANGUAGES[lang_name] = {
-                "parser_lang": language,
-                "queries": {
-                    "imports": language.query(config["queries"]["imports"]),
-                    "functions": language.query(config["queries"]["functions"]),
-                },
-            }
-        except Exception as e:
-            # If loading fails, store None to avoid retrying
-            WORKER_LANGUAGES[lang_name] = None
-            logger.warning(f"Worker failed to load language '{lang_name}': {e}")
+    try:
+        config = LANGUAGE_CONFIGS[lang_name]
+        return LanguageData(
+            parser_lang=_load_language(lang_name),
+            q_imports=_get_query(lang_name, "imports"),
+            q_functions=_get_query(lang_name, "functions"),
+            sentinels=tuple(config.get("sentinels", ())),
+        )
+    except Exception as e:
+        # If loading fails, cache None to avoid retrying
+        logger.warning(f"Worker failed to load language '{lang_name}': {e}")
+        return None
+
 
-    return WORKER_LANGUAGES[lang_name]
+def _worker_init(cache_dir: str, use_cache: bool):
+    """
+    ProcessPoolExecutor initializer: ships per-run settings to each worker once,
+    instead of pickling them alongside every task.
+    """
+    global _WORKER_CTX
+    _WORKER_CTX = (cache_dir, use_cache)
+
+
+def _get_worker_parser(language) -> Parser:
+    """
+    Returns the tree-sitter Parser owned by this worker process, set to `language`.
+    The parser is created once per worker and only re-targeted when the language changes.
+    """
+    global _WORKER_PARSER, _WORKER_PARSER_LANG
+    if _WORKER_PARSER is None:
+        _WORKER_PARSER = Parser()
+    if _WORKER_PARSER_LANG is not language:
+        _WORKER_PARSER.set_language(language)
+        _WORKER_PARSER_LANG = language
+    return _WORKER_PARSER
+
+
+class _ResultCollector:
+    """
+    Accumulates analyses and running totals as results arrive, logging progress.
+    """
+
+    def __init__(self):
+        self.analyses: List[FileAnalysis] = []
+        self.languages_found: Set[str] = set()
+        self.total_functions = 0
+        self.total_imports = 0
+        self.files_found = 0
+        self.from_cache = 0
+        self.processed = 0
+
+    def add_cached(self, hits: List[FileAnalysis]):
+        self.from_cache += len(hits)
+        for analysis in hits:
+            self._add(analysis)
+        self._advance(len(hits))
+
+    def add_parsed(
+        self, result: Optional[FileAnalysis], file_path: str, error: Optional[str]
+    ):
+        self._advance(1)
+        if error:
+            logger.error(f"A worker process failed for {file_path}:\n{error}")
+        elif result:
+            self._add(result)
+
+    def _add(self, analysis: FileAnalysis):
+        self.analyses.append(analysis)
+        self.languages_found.add(analysis.language)
+        self.total_functions += len(analysis.functions)
+        self.total_imports += len(analysis.imports)
+
+    def _advance(self, count: int):
+        # Counts cached and parsed files alike; logs each interval crossed
+        before = self.processed
+        self.processed += count
+        if self.processed // PROGRESS_LOG_INTERVAL != before // PROGRESS_LOG_INTERVAL:
+            logger.info(
+                f"Processed {self.processed} files ({self.files_found} found so far)"
+            )
+
+
+class _ChunkDispatcher:
+    """
+    Runs parse chunks on a process pool, keeping at most max_workers * 4 in flight
+    so the directory walk cannot run arbitrarily far ahead of parsing.
+
+    A worker that dies breaks the pool for good. The chunks that were in flight are
+    then retried once on a fresh pool, one file per task, so a second crash only
+    loses single files; files lost on their retry are counted in `failed`.
+    """
+
+    def __init__(self, max_workers: int, cache_dir: str, use_cache: bool, on_result):
+        self._max_workers = max_workers
+        self._initargs = (cache_dir, use_cache)
+        self._on_result = on_result
+        self._max_pending = max_workers * 4
+        self._queue = deque()  # (chunk, attempt) waiting for room in the window
+        self._pending = {}  # future -> (chunk, attempt)
+        self._lost = []  # (chunk, attempt) that were in flight when the pool broke
+        self._pool_error: Optional[BrokenProcessPool] = None
+        self._restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = self._start_pool()
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def submit(self, chunk: List[FileEntry]):
+        self._queue.append((chunk, 0))
+        self._pump()
+
+    def finish(self):
+        """Blocks until every submitted chunk has been reported or given up on."""
+        while True:
+            self._pump()
+            if self._pool_error is not None:
+                self._recover()
+            elif self._pending:
+                self._drain(FIRST_COMPLETED)
+            else:
+                return
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            initializer=_worker_init,
+            initargs=self._initargs,
+        )
+
+    def _pump(self):
+        # Submits queued chunks while the in-flight window has room
+        while self._queue:
+            if self._executor is None:
+                chunk, _ = self._queue.popleft()
+                self.failed += len(chunk)
+            elif self._pool_error is not None:
+                self._recover()
+            elif len(self._pending) >= self._max_pending:
+                self._drain(FIRST_COMPLETED)
+            else:
+                chunk, attempt = self._queue[0]
+                try:
+                    # Tasks only carry the small FileEntry tuples
+                    future = self._executor.submit(
+                        PerformantRepositoryParser._analyze_file_chunk, chunk
+                    )
+                except BrokenProcessPool as e:
+                    self._pool_error = e
+                    continue
+                self._queue.popleft()
+                self._pending[future] = (chunk, attempt)
+
+    def _drain(self, return_when: str):
+        done, _ = wait(self._pending, return_when=return_when)
+        for future in done:
+            self._consume(future)
+
+    def _consume(self, future):
+        chunk, attempt = self._pending.pop(future)
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # Every in-flight chunk fails with the same exception; the breakage
+            # is logged once in _recover() instead of per chunk.
+            self._pool_error = error
+            self._lost.append((chunk, attempt))
+            return
+        if error is not None:
+            self.failed += len(chunk)
+            logger.error(
+                f"A worker process failed for a chunk of {len(chunk)} "
+                f"files starting at {chunk[0].path}: {error}",
+                exc_info=error,
+            )
+            return
+        for result, file_path, file_error in future.result():
+            self._on_result(result, file_path, file_error)
+
+    def _recover(self):
+        self._drain(ALL_COMPLETED)
+        retry = [chunk for chunk, attempt in self._lost if attempt == 0]
+        given_up = [
+            entry for chunk, attempt in self._lost if attempt > 0 for entry in chunk
+        ]
+        self._lost = []
+        retry_files = sum(len(chunk) for chunk in retry)
+        logger.error(
+            f"A worker process terminated abruptly ({self._pool_error}); "
+            f"retrying {retry_files} in-flight files, giving up on {len(given_up)}"
+        )
+        for entry in given_up:
+            logger.debug(f"Not analyzed after a retry: {entry.path}")
+        self.failed += len(given_up)
+        self._pool_error = None
+
+        self._executor.shutdown(wait=True)
+        if self._restarts < MAX_POOL_RESTARTS:
+            self._restarts += 1
+            self._executor = self._start_pool()
+        else:
+            self._executor = None
+            logger.error("Worker pool failed too often; skipping remaining files")
+        # Retries go to the front of the queue, one file per task
+        self._queue.extendleft(
+            ([entry], 1) for chunk in reversed(retry) for entry in reversed(chunk)
+        )
 
 
 class PerformantRepositoryParser:
@@ -51,62 +302,95 @@ class PerformantRepositoryParser:
         max_file_size: int = 10 * 1024 * 1024,
         use_cache: bool = True,
         cache_dir: str = ".repo_cache",
+        max_files: Optional[int] = None,
     ):
         self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
         self.max_file_size = max_file_size
         self.use_cache = use_cache
+        # Optional cap on how many files are discovered (cache hits included)
+        self.max_files = max_files
         self.cache_dir = Path(cache_dir)
 
-        # Create a simple mapping from extension to language name.
-        # This data IS pickle-able and safe to have here.
-        self.extension_to_lang_name = {
-            ext: name
-            for name, config in LANGUAGE_CONFIGS.items()
-            for ext in config["extensions"]
-        }
+        # Shared, module-level mapping from extension to language name. Workers never
+        # receive it: languages are resolved while collecting files.
+        self.extension_to_lang_name = EXTENSION_TO_LANG_NAME
 
         if self.use_cache:
             self.cache_dir.mkdir(exist_ok=True)
 
-    def _get_file_hash(self, file_path: Path) -> str:
-        stat = file_path.stat()
-        content = f"{file_path}:{stat.st_mtime}:{stat.st_size}"
-        return hashlib.md5(content.encode()).hexdigest()
+    @staticmethod
+    def _get_file_hash(file_path: str, mtime: float, size: int) -> str:
+        content = f"{file_path}:{mtime}:{size}"
+        return xxh3_64_hexdigest(content.encode())
 
-    def _load_from_cache(self, file_path: Path) -> Optional[FileAnalysis]:
+    def _load_from_cache(self, hash_id: str) -> Optional[FileAnalysis]:
         if not self.use_cache:
             return None
-        cache_file = self.cache_dir / f"{self._get_file_hash(file_path)}.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    return FileAnalysis(**json.load(f))
-            except Exception as e:
-                logger.debug(f"Cache load failed for {file_path}: {e}")
-        return None
-
-    def _save_to_cache(self, analysis: FileAnalysis):
-        if not self.use_cache:
-            return
+        # Plain string paths: this runs once per file, and a miss is just an ENOENT
+        cache_file = os.path.join(self.cache_dir, f"{hash_id}{CACHE_SUFFIX}")
         try:
-            cache_file = (
-                self.cache_dir / f"{self._get_file_hash(Path(analysis.file_path))}.json"
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # Transient I/O errors (e.g. EMFILE); entries are renamed into place
+            # whole, so the file itself is not at fault.
+            logger.debug(f"Cache load failed for {cache_file}: {e}")
+            return None
+        except Exception as e:
+            # Anything that fails to unpickle would be skipped by the worker's
+            # mtime check on rewrite, so it has to go now.
+            logger.debug(f"Cache entry {cache_file} is unreadable, removing it: {e}")
+            self._remove_cache_entry(cache_file)
+            return None
+
+        if not isinstance(cached, FileAnalysis):
+            logger.debug(
+                f"Cache entry {cache_file} holds a {type(cached).__name__}, removing it"
             )
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(asdict(analysis), f, indent=2)
+            self._remove_cache_entry(cache_file)
+            return None
+        return cached
+
+    @staticmethod
+    def _remove_cache_entry(cache_file: str):
+        # Drop it so the worker's write is not skipped as a duplicate
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _save_to_cache(cache_dir: str, entry: FileEntry, analysis: FileAnalysis):
+        hash_id = PerformantRepositoryParser._get_file_hash(
+            entry.path, entry.mtime, entry.size
+        )
+        cache_file = os.path.join(cache_dir, f"{hash_id}{CACHE_SUFFIX}")
+        try:
+            # The filename encodes (path, mtime, size), so an entry written after
+            # the source was last modified already holds this analysis.
+            try:
+                if os.stat(cache_file).st_mtime >= entry.mtime:
+                    return
+            except FileNotFoundError:
+                pass
+            # Write-then-rename, so readers never see a partially written entry
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, "wb") as f:
+                    pickle.dump(analysis, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_file)
+                raise
         except Exception as e:
             logger.debug(f"Cache save failed for {analysis.file_path}: {e}")
 
-    def _should_process_file(self, file_path: Path) -> Tuple[bool, Optional[str]]:
-        if file_path.stat().st_size > self.max_file_size:
-            return False, None
-        ext = file_path.suffix.lower()
-        lang_name = self.extension_to_lang_name.get(ext)
-        return lang_name is not None, lang_name
-
     def _collect_files(
         self, repo_path: Path, exclude_patterns: Set[str] = None
-    ) -> List[str]:
+    ) -> Iterator[FileEntry]:
         if exclude_patterns is None:
             exclude_patterns = {
                 ".git",
@@ -117,15 +401,80 @@ class PerformantRepositoryParser:
                 ".venv",
             }
 
-        files = []
-        for root, dirs, filenames in os.walk(repo_path, topdown=True):
-            dirs[:] = [d for d in dirs if d not in exclude_patterns]
-            root_path = Path(root)
-            for filename in filenames:
-                file_path = root_path / filename
-                if self.extension_to_lang_name.get(file_path.suffix.lower()):
-                    files.append(str(file_path))
-        return files
+        try:
+            entries = list(os.scandir(repo_path))
+        except OSError as e:
+            logger.debug(f"Could not scan {repo_path}: {e}")
+            return
+
+        subdirs = []
+        for entry in entries:
+            # Like os.walk, don't descend into symlinked directories
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in exclude_patterns:
+                    subdirs.append(entry.path)
+                continue
+            # Symlinks to directories land here too; os.walk never listed them as files
+            if not entry.is_file():
+                continue
+            # Same semantics as Path.suffix (dotfiles have no extension), without
+            # the splitext call for every file in the tree
+            name = entry.name
+            dot = name.rfind(".")
+            if dot <= 0:
+                continue
+            lang_name = self.extension_to_lang_name.get(name[dot:].lower())
+            if not lang_name:
+                continue
+            # One stat per candidate file; size and mtime are carried to the worker
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                logger.debug(f"Could not stat {entry.path}: {e}")
+                continue
+            if stat.st_size > self.max_file_size:
+                continue
+            yield FileEntry(entry.path, stat.st_size, stat.st_mtime, lang_name)
+
+        for subdir in subdirs:
+            yield from self._collect_files(subdir, exclude_patterns)
+
+    def _split_cached(
+        self, entries: List[FileEntry], io_pool: ThreadPoolExecutor
+    ) -> Tuple[List[FileAnalysis], List[FileEntry]]:
+        """
+        Splits a batch of files into cached analyses and files that still need parsing.
+        Cache hits are pure disk reads, so they are served from a thread pool.
+        """
+        if not self.use_cache:
+            return [], list(entries)
+
+        hash_ids = [
+            self._get_file_hash(entry.path, entry.mtime, entry.size)
+            for entry in entries
+        ]
+        hits, misses = [], []
+        cached_results = io_pool.map(self._load_from_cache, hash_ids)
+        for entry, cached in zip(entries, cached_results):
+            if cached is not None:
+                hits.append(cached)
+            else:
+                misses.append(entry)
+        return hits, misses
+
+    def _plan_chunks(self, to_parse: List[FileEntry]) -> List[List[FileEntry]]:
+        """
+        Groups files into worker tasks. Parse time is roughly linear in file size, so
+        files are scheduled largest-first (LPT): the largest decile gets one file per
+        chunk and the small files fill the gaps in chunks of up to PARSE_CHUNK_SIZE.
+        """
+        to_parse = sorted(to_parse, key=lambda e: e.size, reverse=True)
+        largest = to_parse[: max(1, len(to_parse) // 10)]
+        rest = to_parse[len(largest) :]
+        chunk_size = min(PARSE_CHUNK_SIZE, max(1, len(rest) // (self.max_workers * 4)))
+        return [[entry] for entry in largest] + [
+            rest[i : i + chunk_size] for i in range(0, len(rest), chunk_size)
+        ]
 
     def analyze_repository(
         self, repo_path: str, exclude_patterns: Set[str] = None
@@ -136,139 +485,155 @@ class PerformantRepositoryParser:
             raise FileNotFoundError(f"Repository path does not exist: {repo_path}")
 
         logger.info(f"Starting analysis of repository: {repo_path}")
-        files_to_process = self._collect_files(repo_path_obj, exclude_patterns)
-        logger.info(f"Found {len(files_to_process)} files to analyze")
-
-        if not files_to_process:
-            return RepositoryAnalysis(0, 0, 0, set(), 0.0, [])
-
-        analyses = []
-        languages_found = set()
-
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_file = {
-                # Pass simple, pickle-able types to the static method
-                executor.submit(
-                    PerformantRepositoryParser._analyze_single_file,
-                    file_path,
-                    self.extension_to_lang_name,
-                    self.cache_dir,
-                    self.use_cache,
-                    self.max_file_size,
-                ): file_path
-                for file_path in files_to_process
-            }
-
-            for future in as_completed(future_to_file):
-                try:
-                    result = future.result()
-                    if result:
-                        analyses.append(result)
-                        languages_found.add(result.language)
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    logger.error(
-                        f"A worker process failed for {file_path}: {e}", exc_info=True
-                    )
+        # Files are discovered lazily and fed to the workers in batches, so the
+        # directory walk overlaps with parsing instead of running before it.
+        walker = self._collect_files(repo_path_obj, exclude_patterns)
+        if self.max_files is not None:
+            walker = islice(walker, self.max_files)
+
+        collector = _ResultCollector()
+        # Only cache misses are shipped to the process pool for parsing
+        with ThreadPoolExecutor(
+            max_workers=CACHE_READ_WORKERS
+        ) as io_pool, _ChunkDispatcher(
+            self.max_workers, str(self.cache_dir), self.use_cache, collector.add_parsed
+        ) as dispatcher:
+            while True:
+                batch = list(islice(walker, DISCOVERY_BATCH_SIZE))
+                if not batch:
+                    break
+                collector.files_found += len(batch)
+
+                hits, to_parse = self._split_cached(batch, io_pool)
+                collector.add_cached(hits)
+                for chunk in self._plan_chunks(to_parse):
+                    dispatcher.submit(chunk)
+            dispatcher.finish()
+
+        logger.info(
+            f"Found {collector.files_found} files to analyze, "
+            f"{collector.from_cache} served from cache, {dispatcher.failed} failed"
+        )
 
         total_time = time.time() - start_time
-        total_functions = sum(len(a.functions) for a in analyses)
-        total_imports = sum(len(a.imports) for a in analyses)
 
         logger.info(f"Analysis completed in {total_time:.2f}s")
         return RepositoryAnalysis(
-            len(analyses),
-            total_functions,
-            total_imports,
-            languages_found,
+            len(collector.analyses),
+            collector.total_functions,
+            collector.total_imports,
+            collector.languages_found,
             total_time,
-            analyses,
+            collector.analyses,
         )
 
+    @staticmethod
+    def _analyze_file_chunk(
+        entries: List[FileEntry],
+    ) -> List[Tuple[Optional[FileAnalysis], str, Optional[str]]]:
+        """
+        Worker entry point for a batch of files; results are returned in input order.
+        """
+        return [
+            PerformantRepositoryParser._analyze_single_file(entry) for entry in entries
+        ]
+
     @staticmethod
     def _analyze_single_file(
-        file_path: str,
-        extension_to_lang_name: Dict,
-        cache_dir: Path,
+        entry: FileEntry,
+    ) -> Tuple[Optional[FileAnalysis], str, Optional[str]]:
+        """
+        Analyzes one file in a worker. Returns (analysis, file_path, error) so that
+        a failure in one file is reported back instead of failing its whole chunk.
+        Run settings come from _WORKER_CTX, set by _worker_init.
+        """
+        cache_dir, use_cache = _WORKER_CTX
+        try:
+            result = PerformantRepositoryParser._parse_file(entry, cache_dir, use_cache)
+            return result, entry.path, None
+        except Exception:
+            return None, entry.path, traceback.format_exc()
+
+    @staticmethod
+    def _parse_file(
+        entry: FileEntry,
+        cache_dir: str,
         use_cache: bool,
-        max_file_size: int,
     ) -> Optional[FileAnalysis]:
-        path_obj = Path(file_path)
-
-        # File size check
-        if path_obj.stat().st_size > max_file_size:
-            return None
+        # Size and language were already checked while collecting files
+        file_path, lang_name = entry.path, entry.lang_name
 
-        # Language check
-        lang_name = extension_to_lang_name.get(path_obj.suffix.lower())
-        if not lang_name:
-            return None
-
-        # --- Caching logic (duplicated from instance methods for static context) ---
-        if use_cache:
-            stat = path_obj.stat()
-            content = f"{path_obj}:{stat.st_mtime}:{stat.st_size}"
-            hash_id = hashlib.md5(content.encode()).hexdigest()
-            cache_file = cache_dir / f"{hash_id}.json"
-            if cache_file.exists():
-                try:
-                    with open(cache_file, "r", encoding="utf-8") as f:
-                        return FileAnalysis(**json.load(f))
-                except Exception:
-                    pass  # Cache invalid, proceed to parse
+        # Load language/queries here, inside the worker
+        lang_data = _get_language_for_worker(lang_name)
+        if lang_data is None:
+            return None  # Failed to load language
 
         # --- Main parsing logic ---
         start_time = time.time()
         try:
-            with open(file_path, "rb") as f:
-                code_bytes = f.read()
-        except IOError as e:
+            code_bytes = PerformantRepositoryParser._read_source(file_path, entry.size)
+        except (IOError, ValueError) as e:
             logger.warning(f"Could not read {file_path}: {e}")
             return None
 
-        # Load language/queries here, inside the worker
-        lang_data = _get_language_for_worker(lang_name)
-        if lang_data is None:
-            return None  # Failed to load language
-
-        parser = Parser()
-        parser.set_language(lang_data["parser_lang"])
-        tree = parser.parse(code_bytes)
-
-        # Extract definitions
-        functions = PerformantRepositoryParser._extract_definitions(
-            lang_data["queries"]["functions"], tree.root_node, code_bytes
-        )
-        imports = PerformantRepositoryParser._extract_definitions(
-            lang_data["queries"]["imports"], tree.root_node, code_bytes
-        )
+        try:
+            # Cheap C-level pre-scan: without any sentinel keyword neither query can
+            # match, so skip tree-sitter. find() also works on mmap, unlike `in`.
+            if lang_data.sentinels and not any(
+                code_bytes.find(s) != -1 for s in lang_data.sentinels
+            ):
+                functions, imports = [], []
+            else:
+                parser = _get_worker_parser(lang_data.parser_lang)
+                tree = parser.parse(code_bytes)
+
+                # Extract definitions
+                functions = PerformantRepositoryParser._extract_definitions(
+                    lang_data.q_functions, tree.root_node, code_bytes
+                )
+                imports = PerformantRepositoryParser._extract_definitions(
+                    lang_data.q_imports, tree.root_node, code_bytes
+                )
+            file_size = len(code_bytes)
+        finally:
+            if isinstance(code_bytes, mmap.mmap):
+                code_bytes.close()
 
         analysis = FileAnalysis(
             file_path=file_path,
             functions=functions,
             imports=imports,
             language=lang_name,
-            file_size=len(code_bytes),
+            file_size=file_size,
             processing_time=time.time() - start_time,
         )
 
-        # Save to cache
+        # Save to cache (lookups happen in the parent before dispatch)
         if use_cache:
-            try:
-                with open(cache_file, "w", encoding="utf-8") as f:
-                    json.dump(asdict(analysis), f, indent=2)
-            except Exception:
-                pass  # Non-critical error
+            PerformantRepositoryParser._save_to_cache(cache_dir, entry, analysis)
 
         return analysis
 
+    @staticmethod
+    def _read_source(file_path: str, size: int):
+        """
+        Returns the file contents as bytes, or as a read-only mmap for large files
+        so they are not copied onto the Python heap. Callers must close the mmap.
+        """
+        with open(file_path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return f.read()
+
     @staticmethod
     def _extract_definitions(query, root_node, code_bytes) -> List[str]:
-        definitions = set()
-        captures = query.captures(root_node)
-        for node, _ in captures:
-            name = code_bytes[node.start_byte : node.end_byte].decode(
-                "utf-8", errors="ignore"
-            )
-            definitions.add(name.strip().strip("\"'"))
-        return sorted(list(definitions))
+        # The pinned tree-sitter binding has no QueryCursor, so captures() is the
+        # only query API. Dedupe the raw bytes first and decode only unique names.
+        seen_bytes = {
+            code_bytes[node.start_byte : node.end_byte]
+            for node, _ in query.captures(root_node)
+        }
+        definitions = {
+            b.decode("utf-8", errors="ignore").strip().strip("\"'") for b in seen_bytes
+        }
+        return sorted(definitions)